@@ -1,28 +1,181 @@
 import asyncio
-import json
 import os
 import sqlite3
+import sys
+import time
 import uuid
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import AsyncGenerator, Optional
 
+import aiosqlite
 import httpx
+import orjson
+import zstandard
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
 TINYFISH_API_KEY = os.getenv("TINYFISH_API_KEY", "")
 TINYFISH_URL = "https://agent.tinyfish.ai/v1/automation/run-sse"
+TINYFISH_HEADERS = {"X-API-Key": TINYFISH_API_KEY, "Content-Type": "application/json"}
 DB_PATH = os.getenv("DB_PATH", "jobfish.db")
 
+# Interned upstream event-type constants: the SSE parser interns the incoming
+# "event" value too, so these comparisons hit CPython's pointer-equality fast
+# path instead of a character compare on every frame.
+EVENT_KEY = sys.intern("event")
+EV_STARTED = sys.intern("STARTED")
+EV_STREAMING_URL = sys.intern("STREAMING_URL")
+EV_COMPLETE = sys.intern("COMPLETE")
+
 
 # ---------------------------------------------------------------------------
 # Database
 # ---------------------------------------------------------------------------
 
-def init_db():
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+
+# Agent resultJson payloads are large, repetitive JSON; compressed at rest they
+# take 5-10x fewer B-tree pages. Compressor objects are reused — they are cheap
+# to call but not to construct.
+_zstd_compress = zstandard.ZstdCompressor(level=3).compress
+
+
+def _pack_result(result) -> bytes:
+    return _zstd_compress(orjson.dumps(result))
+
+
+def _now_ms() -> int:
+    """Insert timestamps as integer unix-ms: cheaper than datetime.isoformat()
+    and 8 bytes per row instead of a 27-byte TEXT column."""
+    return int(time.time() * 1000)
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection with WAL + relaxed sync so writers don't block readers."""
     conn = sqlite3.connect(DB_PATH)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class SQLiteConnectionPool:
+    """Pool of long-lived aiosqlite connections.
+
+    Opening a connection per request blocks the event loop on file-open
+    syscalls and throws away SQLite's page cache each time; reusing a fixed
+    set of connections keeps the cache hot across requests.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 8):
+        self._db_path = db_path
+        self._size = pool_size
+        self._queue: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+
+    async def open(self):
+        for _ in range(self._size):
+            conn = await aiosqlite.connect(self._db_path)
+            for pragma in PRAGMAS:
+                await conn.execute(pragma)
+            # Pooled connections only serve SELECTs; writes go through SQLiteWriter.
+            await conn.execute("PRAGMA query_only=1")
+            conn.row_factory = aiosqlite.Row
+            self._queue.put_nowait(conn)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncGenerator[aiosqlite.Connection, None]:
+        conn = await self._queue.get()
+        try:
+            yield conn
+        finally:
+            self._queue.put_nowait(conn)
+
+    async def close(self):
+        while not self._queue.empty():
+            await self._queue.get_nowait().close()
+
+
+class SQLiteWriter:
+    """Single long-lived writer connection fed by an asyncio.Queue.
+
+    WAL lets readers run alongside a writer, but SQLite still allows only one
+    writer at a time. Funnelling every INSERT/UPDATE through one connection
+    avoids writer-lock contention between concurrent requests and keeps that
+    connection's statement cache warm.
+    """
+
+    def __init__(self, db_path: str):
+        self._db_path = db_path
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def open(self):
+        self._conn = await aiosqlite.connect(self._db_path)
+        for pragma in PRAGMAS:
+            await self._conn.execute(pragma)
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                break
+            sql, params, many, future = item
+            try:
+                if many:
+                    await self._conn.executemany(sql, params)
+                else:
+                    await self._conn.execute(sql, params)
+                await self._conn.commit()
+                # The caller may have been cancelled while queued (client
+                # disconnect, shutdown); resolving its future then raises
+                # InvalidStateError and would kill the loop every write in
+                # the app depends on.
+                if not future.cancelled():
+                    future.set_result(None)
+            except Exception as exc:  # surface DB errors to the awaiting route
+                # A failed executemany leaves the partial batch in an open
+                # implicit transaction; roll it back so the next write's
+                # commit can't persist it — but never let a broken
+                # connection take the loop down with it.
+                try:
+                    await self._conn.rollback()
+                except Exception:
+                    pass
+                if not future.cancelled():
+                    future.set_exception(exc)
+
+    async def execute(self, sql: str, params: tuple = ()):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((sql, params, False, future))
+        await future
+
+    async def executemany(self, sql: str, rows: list[tuple]):
+        """Run one prepared statement over all rows in a single transaction."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((sql, rows, True, future))
+        await future
+
+    async def close(self):
+        await self._queue.put(None)
+        if self._task:
+            await self._task
+        if self._conn:
+            await self._conn.close()
+
+
+def init_db():
+    conn = _connect()
     conn.execute("""
         CREATE TABLE IF NOT EXISTS jobs (
             id TEXT PRIMARY KEY,
@@ -31,7 +184,7 @@ def init_db():
             location TEXT,
             apply_url TEXT,
             board TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at INTEGER DEFAULT (strftime('%s','now') * 1000)
         )
     """)
     conn.execute("""
@@ -40,18 +193,36 @@ def init_db():
             job_id TEXT,
             status TEXT DEFAULT 'pending',
             streaming_url TEXT,
-            result_json TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            result_json BLOB,
+            created_at INTEGER DEFAULT (strftime('%s','now') * 1000)
         )
     """)
+    # The list endpoints ORDER BY created_at DESC; without these SQLite does a
+    # full scan + sort instead of walking the index for the newest rows.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_created_at ON applications(created_at DESC)")
     conn.commit()
     conn.close()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_db()
+    await asyncio.to_thread(init_db)
+    app.state.pool = SQLiteConnectionPool(DB_PATH)
+    await app.state.pool.open()
+    app.state.writer = SQLiteWriter(DB_PATH)
+    await app.state.writer.open()
+    # One client for all TinyFish calls: keep-alive + HTTP/2 multiplexing
+    # amortize the TCP/TLS handshake across SSE streams.
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(300, connect=10),
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
     yield
+    await app.state.http.aclose()
+    await app.state.writer.close()
+    await app.state.pool.close()
 
 
 app = FastAPI(title="JobFish API", lifespan=lifespan)
@@ -69,18 +240,44 @@ app.add_middleware(
 # Models
 # ---------------------------------------------------------------------------
 
+# Request models are read-only once validated; freezing them and ignoring
+# unknown fields lets pydantic-core skip mutation and extra-key branches.
+MODEL_CONFIG = ConfigDict(frozen=True, extra="ignore", str_strip_whitespace=True)
+
+# Reused adapter for the job arrays TinyFish returns; building a TypeAdapter
+# per call would redo the schema lookup every time.
+jobs_adapter = TypeAdapter(list[dict])
+
+
 class SearchRequest(BaseModel):
+    model_config = MODEL_CONFIG
+
     query: str
     location: str = "Remote"
     boards: list[str] = ["linkedin", "indeed"]
 
 
 class ApplyRequest(BaseModel):
+    model_config = MODEL_CONFIG
+
     job_id: str
     job_url: str
     resume_data: dict
 
 
+class AutopilotRequest(BaseModel):
+    model_config = MODEL_CONFIG
+
+    query: str
+    location: str = "Remote"
+    boards: list[str] = ["linkedin", "indeed"]
+    resume_data: dict = {}
+    max_jobs: int = 3
+    max_parallel: int = 3
+    # Politeness throttle between application starts; 0 disables it.
+    min_interval_sec: float = 0.0
+
+
 # ---------------------------------------------------------------------------
 # Mock data (used when TINYFISH_API_KEY is not set)
 # ---------------------------------------------------------------------------
@@ -93,18 +290,166 @@ MOCK_JOBS = [
 ]
 
 
-async def mock_sse_stream(events: list[dict]) -> AsyncGenerator[str, None]:
-    for event in events:
-        yield f"data: {json.dumps(event)}\n\n"
-        await asyncio.sleep(0.3)
-
-
 # ---------------------------------------------------------------------------
 # TinyFish helpers
 # ---------------------------------------------------------------------------
 
-async def call_tinyfish_sse(url: str, goal: str) -> AsyncGenerator[dict, None]:
-    """Stream SSE events from TinyFish API."""
+# Goal/URL skeletons are constant; build them once and fill in the blanks per
+# request instead of re-assembling the full strings inline in each route.
+SEARCH_GOAL_TMPL = (
+    "Search for '{query}' jobs in '{location}' on {boards}. "
+    "Extract title, company, location, and direct apply link as a JSON array."
+)
+SEARCH_URL_TMPL = "https://www.linkedin.com/jobs/search/?keywords={keywords}&location={location}"
+APPLY_GOAL_TMPL = (
+    "Fill out the job application form at this URL. "
+    "Applicant name: {name}. "
+    "Email: {email}. "
+    "Phone: {phone}. "
+    "Submit the form when complete and return the confirmation details."
+)
+
+
+@lru_cache(maxsize=256)
+def _join_boards(boards: tuple[str, ...]) -> str:
+    return ", ".join(boards)
+
+
+def build_search_goal(query: str, location: str, boards: tuple[str, ...]) -> str:
+    return SEARCH_GOAL_TMPL.format(query=query, location=location, boards=_join_boards(boards))
+
+
+def build_search_url(query: str, location: str) -> str:
+    return SEARCH_URL_TMPL.format(keywords=query.replace(" ", "+"), location=location.replace(" ", "+"))
+
+
+def build_apply_goal(resume: dict) -> str:
+    return APPLY_GOAL_TMPL.format(
+        name=resume.get("name", "Jane Doe"),
+        email=resume.get("email", "applicant@example.com"),
+        phone=resume.get("phone", "555-0100"),
+    )
+
+
+def _extract_jobs(event: dict) -> list[dict]:
+    """Parse a COMPLETE event's resultJson into a job list.
+
+    TinyFish returns either a bare array or a {"jobs": [...]} wrapper. The
+    mock fallback only applies in mock mode; a malformed production payload
+    yields [] rather than planting fake rows in the jobs table.
+    """
+    result = event.get("resultJson", "[]")
+    try:
+        raw = orjson.loads(result) if isinstance(result, str) else result
+        if isinstance(raw, dict):
+            raw = raw.get("jobs", [])
+        return jobs_adapter.validate_python(raw)
+    except Exception:
+        return MOCK_JOBS if not TINYFISH_API_KEY else []
+
+
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+
+def sse(event: dict) -> bytes:
+    """Frame one event as SSE bytes; StreamingResponse sends them unmodified."""
+    return _SSE_PREFIX + orjson.dumps(event) + _SSE_SUFFIX
+
+
+def sse_tagged(tag: bytes, raw: bytes) -> bytes:
+    """Frame an already-encoded upstream payload inside a wrapper object.
+
+    `tag` is an open wrapper ending in a key (e.g. b'{"type":"X","event":');
+    splicing the raw bytes in skips the loads/dumps round trip that
+    re-wrapping the parsed dict would cost per frame.
+    """
+    return _SSE_PREFIX + tag + raw + b"}" + _SSE_SUFFIX
+
+
+class TokenBucket:
+    """Token-bucket throttle: `burst` immediate starts, then `rate` per second.
+
+    Unlike a fixed sleep between jobs, a full bucket adds zero idle time —
+    waiting only kicks in once the burst budget is spent.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self._rate = rate
+        self._capacity = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._stamp) * self._rate)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+            self._stamp = time.monotonic()
+            self._tokens = 0.0
+
+
+class SSEParser:
+    """Incremental SSE parser over raw bytes.
+
+    Buffers partial chunks and emits one parsed event per complete frame,
+    joining multi-line `data:` fields and skipping comments/keep-alives —
+    neither of which per-line `startswith("data: ")` parsing handles.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, chunk: bytes) -> list[tuple[dict, bytes]]:
+        """Return (parsed, raw payload bytes) pairs for each complete frame."""
+        # Local bindings: this loop runs per network chunk for the lifetime of
+        # a stream, and attribute/global lookups add up across thousands of
+        # frames.
+        buf = self._buf
+        loads = orjson.loads
+        buf += chunk
+        if b"\r" in buf:
+            # The SSE spec allows CRLF and lone-CR line endings; normalize to
+            # \n before scanning or a CRLF-delimited frame never cuts. A
+            # trailing \r may be half of a CRLF split across chunks, so leave
+            # it for the next feed.
+            end = len(buf) - 1 if buf.endswith(b"\r") else len(buf)
+            buf[:end] = bytes(buf[:end]).replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        events = []
+        while (cut := buf.find(b"\n\n")) != -1:
+            block = bytes(buf[:cut])
+            del buf[:cut + 2]
+            data_lines = [
+                line[5:].lstrip(b" ")
+                for line in block.split(b"\n")
+                if line.startswith(b"data:")
+            ]
+            if not data_lines:
+                continue
+            payload = b"\n".join(data_lines)
+            try:
+                event = loads(payload)
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(event, dict):
+                etype = event.get(EVENT_KEY)
+                if type(etype) is str and len(etype) < 32:
+                    event[EVENT_KEY] = sys.intern(etype)
+            events.append((event, payload))
+        return events
+
+
+async def call_tinyfish_sse(url: str, goal: str) -> AsyncGenerator[tuple[dict, bytes], None]:
+    """Stream (event, raw payload bytes) pairs from the TinyFish API.
+
+    The raw bytes let SSE proxy paths forward upstream frames without
+    re-serializing them; plain consumers can ignore the second element.
+    """
     if not TINYFISH_API_KEY:
         # Mock mode
         mock_events = [
@@ -112,27 +457,24 @@ async def call_tinyfish_sse(url: str, goal: str) -> AsyncGenerator[dict, None]:
             {"event": "STREAMING_URL", "streamingUrl": "https://example.com/stream/mock"},
             {"event": "PROGRESS", "message": "Navigating to job board..."},
             {"event": "PROGRESS", "message": "Extracting job listings..."},
-            {"event": "COMPLETE", "resultJson": json.dumps(MOCK_JOBS[:2])},
+            {"event": "COMPLETE", "resultJson": orjson.dumps(MOCK_JOBS[:2]).decode()},
         ]
         for event in mock_events:
-            yield event
+            yield event, orjson.dumps(event)
             await asyncio.sleep(0.2)
         return
 
-    async with httpx.AsyncClient(timeout=120) as client:
-        async with client.stream(
-            "POST",
-            TINYFISH_URL,
-            headers={"X-API-Key": TINYFISH_API_KEY, "Content-Type": "application/json"},
-            json={"url": url, "goal": goal},
-        ) as response:
-            response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    try:
-                        yield json.loads(line[6:])
-                    except json.JSONDecodeError:
-                        pass
+    async with app.state.http.stream(
+        "POST",
+        TINYFISH_URL,
+        headers=TINYFISH_HEADERS,
+        json={"url": url, "goal": goal},
+    ) as response:
+        response.raise_for_status()
+        parser = SSEParser()
+        async for chunk in response.aiter_bytes():
+            for pair in parser.feed(chunk):
+                yield pair
 
 
 # ---------------------------------------------------------------------------
@@ -147,42 +489,36 @@ async def health():
 @app.post("/api/search-jobs")
 async def search_jobs(req: SearchRequest):
     """Search job boards via TinyFish and return structured listings."""
-    boards_str = ", ".join(req.boards)
-    goal = (
-        f"Search for '{req.query}' jobs in '{req.location}' on {boards_str}. "
-        "Extract title, company, location, and direct apply link as a JSON array."
-    )
-    target_url = f"https://www.linkedin.com/jobs/search/?keywords={req.query.replace(' ', '+')}&location={req.location.replace(' ', '+')}"
+    boards_str = _join_boards(tuple(req.boards))
+    goal = build_search_goal(req.query, req.location, tuple(req.boards))
+    target_url = build_search_url(req.query, req.location)
 
     jobs = []
     run_id = None
     streaming_url = None
 
-    async for event in call_tinyfish_sse(target_url, goal):
-        etype = event.get("event")
-        if etype == "STARTED":
+    async for event, _ in call_tinyfish_sse(target_url, goal):
+        etype = event.get(EVENT_KEY)
+        if etype == EV_STARTED:
             run_id = event.get("runId", str(uuid.uuid4()))
-        elif etype == "STREAMING_URL":
+        elif etype == EV_STREAMING_URL:
             streaming_url = event.get("streamingUrl")
-        elif etype == "COMPLETE":
-            result = event.get("resultJson", "[]")
-            try:
-                raw = json.loads(result) if isinstance(result, str) else result
-                if isinstance(raw, list):
-                    jobs = raw
-            except Exception:
-                jobs = MOCK_JOBS
-
-    # Persist to DB
-    conn = sqlite3.connect(DB_PATH)
-    for job in jobs:
-        jid = job.get("id") or str(uuid.uuid4())
-        conn.execute(
-            "INSERT OR REPLACE INTO jobs (id, title, company, location, apply_url, board) VALUES (?,?,?,?,?,?)",
-            (jid, job.get("title",""), job.get("company",""), job.get("location",""), job.get("apply_url",""), job.get("board", boards_str)),
+        elif etype == EV_COMPLETE:
+            # COMPLETE is terminal; no point draining further frames.
+            jobs = _extract_jobs(event)
+            break
+
+    # Persist to DB: one prepared statement + one transaction for the batch
+    if jobs:
+        now = _now_ms()
+        rows = [
+            (job.get("id") or str(uuid.uuid4()), job.get("title",""), job.get("company",""), job.get("location",""), job.get("apply_url",""), job.get("board", boards_str), now)
+            for job in jobs
+        ]
+        await app.state.writer.executemany(
+            "INSERT OR REPLACE INTO jobs (id, title, company, location, apply_url, board, created_at) VALUES (?,?,?,?,?,?,?)",
+            rows,
         )
-    conn.commit()
-    conn.close()
 
     return {"run_id": run_id, "streaming_url": streaming_url, "jobs": jobs, "mock_mode": not bool(TINYFISH_API_KEY)}
 
@@ -190,36 +526,124 @@ async def search_jobs(req: SearchRequest):
 @app.post("/api/apply")
 async def apply_to_job(req: ApplyRequest):
     """Use TinyFish agent to fill out a job application form."""
-    resume = req.resume_data
-    goal = (
-        f"Fill out the job application form at this URL. "
-        f"Applicant name: {resume.get('name', 'Jane Doe')}. "
-        f"Email: {resume.get('email', 'applicant@example.com')}. "
-        f"Phone: {resume.get('phone', '555-0100')}. "
-        f"Submit the form when complete and return the confirmation details."
-    )
+    goal = build_apply_goal(req.resume_data)
 
     app_id = str(uuid.uuid4())
     streaming_url = None
     result = None
+    status = "submitted"
+    error = None
+
+    try:
+        async for event, _ in call_tinyfish_sse(req.job_url, goal):
+            etype = event.get(EVENT_KEY)
+            if etype == EV_STREAMING_URL:
+                streaming_url = event.get("streamingUrl")
+            elif etype == EV_COMPLETE:
+                result = event.get("resultJson")
+    except Exception as exc:
+        status = "failed"
+        error = str(exc)
+    finally:
+        # Single final write per application; intermediate events stay in memory.
+        await app.state.writer.execute(
+            "INSERT INTO applications (id, job_id, status, streaming_url, result_json, created_at) VALUES (?,?,?,?,?,?)",
+            (app_id, req.job_id, status, streaming_url, _pack_result(result), _now_ms()),
+        )
 
-    async for event in call_tinyfish_sse(req.job_url, goal):
-        etype = event.get("event")
-        if etype == "STREAMING_URL":
-            streaming_url = event.get("streamingUrl")
-        elif etype == "COMPLETE":
-            result = event.get("resultJson")
-
-    # Persist application
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute(
-        "INSERT INTO applications (id, job_id, status, streaming_url, result_json) VALUES (?,?,?,?,?)",
-        (app_id, req.job_id, "submitted", streaming_url, json.dumps(result)),
-    )
-    conn.commit()
-    conn.close()
-
-    return {"application_id": app_id, "status": "submitted", "streaming_url": streaming_url, "result": result, "mock_mode": not bool(TINYFISH_API_KEY)}
+    if error:
+        raise HTTPException(status_code=502, detail=f"TinyFish run failed: {error}")
+
+    return {"application_id": app_id, "status": status, "streaming_url": streaming_url, "result": result, "mock_mode": not bool(TINYFISH_API_KEY)}
+
+
+@app.post("/api/autopilot")
+async def autopilot(req: AutopilotRequest):
+    """Search for matching jobs, then apply to the top results in parallel.
+
+    Streams tagged SSE events to the frontend: SEARCH_PROGRESS frames while
+    job boards are scraped, APP_PROGRESS/APP_DONE frames per application, and
+    a final SUMMARY frame. Applications run concurrently, bounded by
+    max_parallel, so total wall-clock tracks the slowest job rather than the
+    sum of all of them.
+    """
+    apply_goal = build_apply_goal(req.resume_data)
+    bucket = TokenBucket(rate=1.0 / req.min_interval_sec, burst=max(1, req.max_parallel)) if req.min_interval_sec > 0 else None
+
+    async def apply_one(i: int, job: dict, sem: asyncio.Semaphore, out: asyncio.Queue):
+        g = job.get
+        apply_url = g("apply_url") or g("url", "")
+        app_id = str(uuid.uuid4())
+        streaming_url = None
+        result = None
+        status = "submitted"
+        try:
+            async with sem:
+                if bucket:
+                    await bucket.acquire()
+                tag = b'{"type":"APP_PROGRESS","jobIndex":%d,"event":' % (i + 1)
+                put = out.put
+                async for event, raw in call_tinyfish_sse(apply_url, apply_goal):
+                    etype = event.get(EVENT_KEY)
+                    if etype == EV_STREAMING_URL:
+                        streaming_url = event.get("streamingUrl")
+                    elif etype == EV_COMPLETE:
+                        result = event.get("resultJson")
+                    await put(sse_tagged(tag, raw))
+        except Exception as exc:
+            status = "failed"
+            await out.put({"type": "APP_ERROR", "jobIndex": i + 1, "error": str(exc)})
+        finally:
+            # APP_DONE must reach the queue no matter what, or the drain loop
+            # in stream() waits forever; a failed insert downgrades the status
+            # but never swallows the completion frame.
+            try:
+                await app.state.writer.execute(
+                    "INSERT INTO applications (id, job_id, status, streaming_url, result_json, created_at) VALUES (?,?,?,?,?,?)",
+                    (app_id, g("id", ""), status, streaming_url, _pack_result(result), _now_ms()),
+                )
+            except Exception as exc:
+                status = "failed"
+                await out.put({"type": "APP_ERROR", "jobIndex": i + 1, "error": str(exc)})
+            finally:
+                await out.put({"type": "APP_DONE", "jobIndex": i + 1, "applicationId": app_id, "status": status})
+
+    async def stream() -> AsyncGenerator[bytes, None]:
+        # Phase 1: search
+        goal = build_search_goal(req.query, req.location, tuple(req.boards))
+        target_url = build_search_url(req.query, req.location)
+
+        found = []
+        search_tag = b'{"type":"SEARCH_PROGRESS","event":'
+        async for event, raw in call_tinyfish_sse(target_url, goal):
+            yield sse_tagged(search_tag, raw)
+            if event.get(EVENT_KEY) == EV_COMPLETE:
+                found = _extract_jobs(event)
+                break
+
+        found = found[:req.max_jobs]
+        yield sse({"type": "SEARCH_DONE", "jobCount": len(found)})
+
+        # Phase 2: apply in parallel, bounded by the semaphore
+        sem = asyncio.Semaphore(max(1, req.max_parallel))
+        out: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(apply_one(i, job, sem, out)) for i, job in enumerate(found)]
+
+        done = 0
+        get_item = out.get
+        while done < len(tasks):
+            item = await get_item()
+            if isinstance(item, bytes):  # pre-framed upstream pass-through
+                yield item
+                continue
+            if item.get("type") == "APP_DONE":
+                done += 1
+            yield sse(item)
+        await asyncio.gather(*tasks)
+
+        yield sse({"type": "SUMMARY", "applied": len(tasks)})
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
 
 
 @app.get("/api/status/{run_id}")
@@ -228,24 +652,26 @@ async def stream_status(run_id: str):
     async def event_generator():
         # In production, retrieve the stored streaming_url for run_id and proxy events.
         # For now, emit a status heartbeat.
-        yield f"data: {json.dumps({'run_id': run_id, 'status': 'active'})}\n\n"
+        yield sse({"run_id": run_id, "status": "active"})
         await asyncio.sleep(1)
-        yield f"data: {json.dumps({'run_id': run_id, 'status': 'complete'})}\n\n"
+        yield sse({"run_id": run_id, "status": "complete"})
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
 @app.get("/api/applications")
 async def list_applications():
-    conn = sqlite3.connect(DB_PATH)
-    rows = conn.execute("SELECT id, job_id, status, streaming_url, created_at FROM applications ORDER BY created_at DESC LIMIT 50").fetchall()
-    conn.close()
-    return [{"id": r[0], "job_id": r[1], "status": r[2], "streaming_url": r[3], "created_at": r[4]} for r in rows]
+    async with app.state.pool.connection() as conn:
+        cur = await conn.execute("SELECT id, job_id, status, streaming_url, created_at FROM applications ORDER BY created_at DESC LIMIT 50")
+        rows = await cur.fetchall()
+    # sqlite3.Row -> dict is C-level; orjson serializes without FastAPI's
+    # jsonable_encoder pass over every row.
+    return Response(orjson.dumps([dict(r) for r in rows]), media_type="application/json")
 
 
 @app.get("/api/jobs")
 async def list_jobs():
-    conn = sqlite3.connect(DB_PATH)
-    rows = conn.execute("SELECT id, title, company, location, apply_url, board, created_at FROM jobs ORDER BY created_at DESC LIMIT 100").fetchall()
-    conn.close()
-    return [{"id": r[0], "title": r[1], "company": r[2], "location": r[3], "apply_url": r[4], "board": r[5], "created_at": r[6]} for r in rows]
+    async with app.state.pool.connection() as conn:
+        cur = await conn.execute("SELECT id, title, company, location, apply_url, board, created_at FROM jobs ORDER BY created_at DESC LIMIT 100")
+        rows = await cur.fetchall()
+    return Response(orjson.dumps([dict(r) for r in rows]), media_type="application/json")
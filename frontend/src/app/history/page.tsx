@@ -9,7 +9,7 @@ interface Application {
   job_id: string;
   status: string;
   streaming_url: string | null;
-  created_at: string;
+  created_at: number;
 }
 
 const STATUS_COLORS: Record<string, string> = {